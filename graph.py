@@ -3,10 +3,18 @@
 
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 import seaborn as sns
 import numpy as np
+from dataclasses import dataclass
 from google.colab import files
 
+try:
+    import numba
+except ImportError:  # Preinstalled on Colab; fall back to plain NumPy elsewhere
+    numba = None
+
 # Set style for better-looking plots
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (14, 10)
@@ -25,34 +33,67 @@ if 'load_balancer_data.csv' not in uploaded:
 else:
     print("\n✅ File uploaded successfully!")
 
+# Explicit column types skip pandas' type inference. Integer columns are
+# parsed as int64 and only narrowed to NARROW_DTYPES after a range check,
+# because read_csv wraps out-of-range values silently for narrow dtypes.
+NARROW_DTYPES = {
+    'server_id': np.int16,
+    'time_step': np.int32,
+}
+CSV_DTYPES = {
+    'server_id': np.int64,
+    'time_step': np.int64,
+    'load': np.float32,
+    'server_load': np.float32,
+}
+
+def _narrow_int_column(values, target):
+    """Downcast an int64 column to target, refusing values that would wrap"""
+    limits = np.iinfo(target)
+    if len(values) and (values.min() < limits.min or values.max() > limits.max):
+        raise ValueError(f"{values.name} out of range for {limits.dtype}: "
+                         f"[{values.min()}, {values.max()}]")
+    return values.astype(target)
+
 def load_and_parse_data(filename):
     """Load the CSV data exported from Java simulation"""
+    head_lines = []  # first few lines, kept for the error report
     try:
-        # Read all lines
-        with open(filename, 'r') as f:
-            lines = f.readlines()
-        
-        print(f"  Total lines read: {len(lines)}")
-        
-        # Find where load history starts
+        # Single forward pass to locate the section marker; the file body is
+        # never held in memory, pandas parses both sections straight from disk
         split_idx = None
-        for i, line in enumerate(lines):
-            if line.startswith('# Server Load History'):
-                split_idx = i
-                break
+        metrics_rows = 0
+        with open(filename, 'r') as f:
+            for i, line in enumerate(f):
+                if i < 10:
+                    head_lines.append(line)
+                if split_idx is None:
+                    if line.startswith('# Server Load History'):
+                        split_idx = i
+                    elif line.strip():
+                        metrics_rows += 1
+                # Stop once the marker is found and the error-report lines are buffered
+                if split_idx is not None and len(head_lines) == 10:
+                    break
         
         if split_idx is None:
             raise ValueError("Could not find '# Server Load History' marker in CSV")
         
+        print(f"  Metrics rows found: {max(metrics_rows - 1, 0)}")
         print(f"  Split index found at line: {split_idx}")
         
-        # Parse metrics (include header line)
-        metrics_data = ''.join(lines[0:split_idx])
-        metrics_df = pd.read_csv(pd.io.common.StringIO(metrics_data))
+        # Parse metrics (header line + non-blank rows before the marker)
+        metrics_df = pd.read_csv(filename, nrows=max(metrics_rows - 1, 0),
+                                 engine='c', dtype=CSV_DTYPES)
         
-        # Parse load history (skip blank line, include header)
-        history_data = ''.join(lines[split_idx+1:])
-        history_df = pd.read_csv(pd.io.common.StringIO(history_data))
+        # Parse load history (skip everything up to and including the marker)
+        history_df = pd.read_csv(filename, skiprows=split_idx + 1,
+                                 engine='c', dtype=CSV_DTYPES)
+        
+        for df in (metrics_df, history_df):
+            for column, target in NARROW_DTYPES.items():
+                if column in df:
+                    df[column] = _narrow_int_column(df[column], target)
         
         print(f"  Metrics columns: {list(metrics_df.columns)}")
         print(f"  History columns: {list(history_df.columns)}")
@@ -66,25 +107,199 @@ def load_and_parse_data(filename):
     except Exception as e:
         print(f"\n❌ ERROR parsing file: {str(e)}")
         print("\nFirst 10 lines of the file:")
-        with open(filename, 'r') as f:
-            for i, line in enumerate(f):
-                if i < 10:
-                    print(f"  Line {i}: {line.rstrip()}")
+        for i, line in enumerate(head_lines):
+            print(f"  Line {i}: {line.rstrip()}")
         return None, None
 
-def plot_request_distribution(metrics_df):
+@dataclass
+class LoadData:
+    """Column arrays extracted once from the two CSV sections"""
+    m_sid: np.ndarray   # metrics: server_id per request
+    m_load: np.ndarray  # metrics: server_load per request
+    h_sid: np.ndarray   # history: server_id per record
+    h_t: np.ndarray     # history: time_step per record
+    h_load: np.ndarray  # history: load per record
+    m_server_ids: np.ndarray  # sorted ids in the metrics section
+    h_server_ids: np.ndarray  # sorted ids in the load history
+    time_steps: np.ndarray    # sorted time steps in the load history
+    server_labels: list       # tick label per entry of m_server_ids
+
+def extract_columns(metrics_df, history_df):
+    """Pull the plotted columns out of the DataFrames as plain ndarrays"""
+    m_sid = metrics_df['server_id'].to_numpy()
+    h_sid = history_df['server_id'].to_numpy()
+    h_t = history_df['time_step'].to_numpy()
+    
+    # Server/time catalogs are scanned once here and shared by every plot;
+    # each section keeps its own so no plot shows servers it has no data for
+    m_server_ids = np.unique(m_sid)
+    return LoadData(
+        m_sid=m_sid,
+        m_load=metrics_df['server_load'].to_numpy(),
+        h_sid=h_sid,
+        h_t=h_t,
+        h_load=history_df['load'].to_numpy(),
+        m_server_ids=m_server_ids,
+        h_server_ids=np.unique(h_sid),
+        time_steps=np.unique(h_t),
+        server_labels=[f'S{sid}' for sid in m_server_ids],
+    )
+
+def server_load_stats(sorted_loads, starts, counts):
+    """Per-server mean and sample std of load from one reduceat sweep
+    
+    sorted_loads must be grouped by server; starts/counts give each group's
+    offset and size. Servers with no rows get NaN.
+    """
+    loads = sorted_loads.astype(np.float64)
+    # reduceat mis-handles empty groups, so only reduce over the non-empty ones
+    nonempty = counts > 0
+    sums = np.add.reduceat(loads, starts[nonempty])
+    sqsums = np.add.reduceat(loads * loads, starts[nonempty])
+    n = counts[nonempty]
+    
+    means = np.full(counts.size, np.nan)
+    stds = np.full(counts.size, np.nan)
+    means[nonempty] = sums / n
+    # Sample variance (ddof=1) to match pandas' std(); single-row groups give NaN
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variances = np.maximum(sqsums - sums * means[nonempty], 0) / (n - 1)
+    stds[nonempty] = np.sqrt(variances)
+    
+    return means, stds
+
+if numba is not None:
+    @numba.njit(cache=True, parallel=True)
+    def _scatter_loads_numba(mat, sid_idx, t_idx, load):
+        # Rows run in parallel, so every (sid_idx, t_idx) cell must be unique
+        for i in numba.prange(load.size):
+            mat[sid_idx[i], t_idx[i]] = load[i]
+
+def _scatter_loads(mat, sid_idx, t_idx, load):
+    if numba is None:
+        mat[sid_idx, t_idx] = load
+    else:
+        _scatter_loads_numba(mat, sid_idx, t_idx, load)
+
+def build_load_matrix(sid_idx, t_idx, load, n_s, n_t):
+    """Dense (server, time_step) load matrix; cells with no record are NaN"""
+    mat = np.full((n_s, n_t), np.nan, dtype=np.float32)
+    _scatter_loads(mat, sid_idx, t_idx, load.astype(np.float32, copy=False))
+    return mat
+
+def server_load_matrix(data):
+    """Reshape load history into a (h_server_ids, time_steps) load matrix
+    
+    Raises ValueError if a (server_id, time_step) pair appears more than once,
+    as DataFrame.pivot did.
+    """
+    sid_idx = np.searchsorted(data.h_server_ids, data.h_sid)
+    t_idx = np.searchsorted(data.time_steps, data.h_t)
+    
+    n_cells = data.h_server_ids.size * data.time_steps.size
+    cells = sid_idx * data.time_steps.size + t_idx
+    if cells.size and np.bincount(cells, minlength=n_cells).max() > 1:
+        raise ValueError("Duplicate (server_id, time_step) entries in load history")
+    
+    return build_load_matrix(sid_idx, t_idx, data.h_load,
+                             data.h_server_ids.size, data.time_steps.size)
+
+# Past this many series the timeline is drawn as a bitmap in vector output
+RASTERIZE_MIN_SERVERS = 50
+
+def draw_server_lines(ax, sids, ts, load_matrix, markersize, label_fmt,
+                      rasterized=None):
+    """Draw every server's load series as one LineCollection plus one scatter"""
+    if rasterized is None:
+        rasterized = sids.size > RASTERIZE_MIN_SERVERS
+    colors = plt.cm.tab10(np.arange(sids.size) % 10)
+    segments = [np.column_stack([ts, server_loads]) for server_loads in load_matrix]
+    ax.add_collection(LineCollection(segments, linewidths=2, colors=colors,
+                                     rasterized=rasterized))
+    ax.scatter(np.tile(ts, sids.size), load_matrix.ravel(), s=markersize ** 2,
+               c=np.repeat(colors, ts.size, axis=0), marker='o',
+               rasterized=rasterized)
+    ax.autoscale()
+    
+    # Collections carry no per-server labels, so build the legend from proxies
+    return [Line2D([], [], color=color, linewidth=2, marker='o',
+                   markersize=markersize, label=label_fmt.format(server_id))
+            for server_id, color in zip(sids, colors)]
+
+@dataclass
+class LoadSummary:
+    """Per-server aggregates shared by the standalone plots and the dashboard"""
+    request_counts: np.ndarray  # requests per entry of m_server_ids
+    avg_loads: np.ndarray       # mean server_load per entry of m_server_ids
+    load_std: np.ndarray        # sample std of server_load per entry of m_server_ids
+    box_stats: list             # ax.bxp input per entry of m_server_ids
+    load_matrix: np.ndarray     # (h_server_ids, time_steps) load history, NaN if missing
+
+def box_stats(sorted_loads, starts, counts, means, labels, whis=1.5):
+    """Boxplot statistics for ax.bxp, vectorized across servers
+    
+    sorted_loads must be sorted by server and then by load, with every group
+    non-empty. Follows matplotlib's boxplot_stats: linear quartiles, whiskers
+    at the most extreme points within whis*IQR, clamped to the box.
+    """
+    loads = sorted_loads.astype(np.float64)
+    
+    def quantile(q):
+        pos = q * (counts - 1)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.minimum(lo + 1, counts - 1)
+        return loads[starts + lo] + (pos - lo) * (loads[starts + hi] - loads[starts + lo])
+    
+    q1, med, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    iqr = q3 - q1
+    
+    group = np.repeat(np.arange(counts.size), counts)
+    inside = (loads >= (q1 - whis * iqr)[group]) & (loads <= (q3 + whis * iqr)[group])
+    whislo = np.minimum(np.minimum.reduceat(np.where(inside, loads, np.inf), starts), q1)
+    whishi = np.maximum(np.maximum.reduceat(np.where(inside, loads, -np.inf), starts), q3)
+    
+    outside = (loads < whislo[group]) | (loads > whishi[group])
+    n_fliers = np.add.reduceat(outside.astype(np.intp), starts)
+    fliers = np.split(loads[outside], np.cumsum(n_fliers)[:-1])
+    
+    return [{'label': label, 'med': med[i], 'q1': q1[i], 'q3': q3[i],
+             'whislo': whislo[i], 'whishi': whishi[i], 'mean': means[i],
+             'fliers': fliers[i]}
+            for i, label in enumerate(labels)]
+
+def summarize(data):
+    """Compute every per-server aggregate once from one (server, load) ordering"""
+    # Sort by load, then stably by server: groups the servers and leaves each
+    # group ordered for the boxplot quartiles (much faster than np.lexsort)
+    order = np.argsort(data.m_load)
+    order = order[np.argsort(data.m_sid[order], kind='stable')]
+    sorted_loads = data.m_load[order]
+    starts = np.searchsorted(data.m_sid[order], data.m_server_ids)
+    counts = np.diff(np.append(starts, sorted_loads.size))
+    avg_loads, load_std = server_load_stats(sorted_loads, starts, counts)
+    
+    return LoadSummary(
+        request_counts=counts,
+        avg_loads=avg_loads,
+        load_std=load_std,
+        box_stats=box_stats(sorted_loads, starts, counts, avg_loads,
+                            data.server_labels),
+        load_matrix=server_load_matrix(data),
+    )
+
+def plot_request_distribution(data, summary):
     """Plot 1: Request distribution across servers"""
     plt.figure(figsize=(10, 6))
     
-    request_counts = metrics_df['server_id'].value_counts().sort_index()
-    bars = plt.bar(request_counts.index, request_counts.values, 
+    server_ids = data.m_server_ids
+    bars = plt.bar(server_ids, summary.request_counts, 
                    color='steelblue', edgecolor='black', alpha=0.7)
     
     plt.xlabel('Server ID', fontsize=12, fontweight='bold')
     plt.ylabel('Number of Requests', fontsize=12, fontweight='bold')
     plt.title('Round Robin: Request Distribution Across Servers', 
               fontsize=14, fontweight='bold')
-    plt.xticks(request_counts.index)
+    plt.xticks(server_ids)
     plt.grid(axis='y', alpha=0.3)
     
     # Add value labels on bars
@@ -98,36 +313,38 @@ def plot_request_distribution(metrics_df):
     plt.show()
     print("✓ Request Distribution Plot Created")
 
-def plot_server_loads_over_time(history_df):
+def plot_server_loads_over_time(data, summary):
     """Plot 2: Server loads over time"""
     plt.figure(figsize=(12, 6))
     
-    for server_id in sorted(history_df['server_id'].unique()):
-        server_data = history_df[history_df['server_id'] == server_id]
-        plt.plot(server_data['time_step'], server_data['load'], 
-                marker='o', markersize=3, label=f'Server {server_id}', linewidth=2)
+    # Each matrix row is one server's time series
+    handles = draw_server_lines(plt.gca(), data.h_server_ids, data.time_steps,
+                                summary.load_matrix,
+                                markersize=3, label_fmt='Server {}')
     
     plt.xlabel('Time Step', fontsize=12, fontweight='bold')
     plt.ylabel('Server Load', fontsize=12, fontweight='bold')
     plt.title('Server Loads Over Time - Round Robin Algorithm', 
               fontsize=14, fontweight='bold')
-    plt.legend(loc='best', frameon=True, shadow=True)
+    plt.legend(handles=handles, loc='best', frameon=True, shadow=True)
     plt.grid(alpha=0.3)
     
     plt.tight_layout()
     plt.show()
     print("✓ Server Loads Timeline Created")
 
-def plot_load_heatmap(history_df):
+def plot_load_heatmap(data, summary):
     """Plot 3: Heatmap of server loads"""
     plt.figure(figsize=(14, 6))
     
-    # Pivot data for heatmap
-    pivot_data = history_df.pivot(index='server_id', columns='time_step', values='load')
-    pivot_data = pivot_data.fillna(0)
+    # Missing cells are shown as 0 (copy, the matrix is shared with the timelines).
+    # Labelled frame wrapper so seaborn keeps its 'auto' tick thinning
+    load_matrix = pd.DataFrame(np.nan_to_num(summary.load_matrix),
+                               index=data.h_server_ids, columns=data.time_steps,
+                               copy=False)
     
-    sns.heatmap(pivot_data, cmap='YlOrRd', cbar_kws={'label': 'Load'}, 
-                linewidths=0.5, linecolor='gray')
+    sns.heatmap(load_matrix, cmap='YlOrRd', cbar_kws={'label': 'Load'}, 
+                linewidths=0.5, linecolor='gray', rasterized=True)
     
     plt.xlabel('Time Step', fontsize=12, fontweight='bold')
     plt.ylabel('Server ID', fontsize=12, fontweight='bold')
@@ -138,16 +355,12 @@ def plot_load_heatmap(history_df):
     plt.show()
     print("✓ Load Heatmap Created")
 
-def plot_load_statistics(metrics_df):
+def plot_load_statistics(data, summary):
     """Plot 4: Box plot of server load distribution"""
     plt.figure(figsize=(10, 6))
     
-    # Group by server and get load statistics
-    server_loads = [metrics_df[metrics_df['server_id'] == sid]['server_load'].values 
-                   for sid in sorted(metrics_df['server_id'].unique())]
-    
-    box = plt.boxplot(server_loads, labels=[f'S{i}' for i in range(len(server_loads))],
-                      patch_artist=True, showmeans=True)
+    # Statistics were precomputed in summarize(), so bxp only has to draw
+    box = plt.gca().bxp(summary.box_stats, patch_artist=True, showmeans=True)
     
     # Color the boxes
     for patch in box['boxes']:
@@ -163,16 +376,15 @@ def plot_load_statistics(metrics_df):
     plt.show()
     print("✓ Load Statistics Plot Created")
 
-def create_summary_dashboard(metrics_df, history_df):
+def create_summary_dashboard(data, summary):
     """Create a comprehensive dashboard"""
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12), constrained_layout=True)
     fig.suptitle('Round Robin Load Balancer - Performance Dashboard', 
                  fontsize=16, fontweight='bold')
     
     # Plot 1: Request distribution
     ax1 = axes[0, 0]
-    request_counts = metrics_df['server_id'].value_counts().sort_index()
-    bars = ax1.bar(request_counts.index, request_counts.values, 
+    bars = ax1.bar(data.m_server_ids, summary.request_counts, 
                    color='steelblue', edgecolor='black', alpha=0.7)
     ax1.set_xlabel('Server ID', fontweight='bold')
     ax1.set_ylabel('Number of Requests', fontweight='bold')
@@ -181,8 +393,7 @@ def create_summary_dashboard(metrics_df, history_df):
     
     # Plot 2: Average load per server
     ax2 = axes[0, 1]
-    avg_loads = metrics_df.groupby('server_id')['server_load'].mean()
-    ax2.bar(avg_loads.index, avg_loads.values, color='coral', 
+    ax2.bar(data.m_server_ids, summary.avg_loads, color='coral', 
             edgecolor='black', alpha=0.7)
     ax2.set_xlabel('Server ID', fontweight='bold')
     ax2.set_ylabel('Average Load', fontweight='bold')
@@ -191,27 +402,25 @@ def create_summary_dashboard(metrics_df, history_df):
     
     # Plot 3: Load timeline
     ax3 = axes[1, 0]
-    for server_id in sorted(history_df['server_id'].unique()):
-        server_data = history_df[history_df['server_id'] == server_id]
-        ax3.plot(server_data['time_step'], server_data['load'], 
-                label=f'S{server_id}', linewidth=2, marker='o', markersize=2)
+    # Only the timeline holds enough points to be worth rasterizing
+    handles = draw_server_lines(ax3, data.h_server_ids, data.time_steps,
+                                summary.load_matrix,
+                                markersize=2, label_fmt='S{}', rasterized=True)
     ax3.set_xlabel('Time Step', fontweight='bold')
     ax3.set_ylabel('Load', fontweight='bold')
     ax3.set_title('Server Loads Over Time', fontweight='bold')
-    ax3.legend(loc='best', ncol=2, fontsize=8)
+    ax3.legend(handles=handles, loc='best', ncol=2, fontsize=8)
     ax3.grid(alpha=0.3)
     
     # Plot 4: Load variance
     ax4 = axes[1, 1]
-    load_std = metrics_df.groupby('server_id')['server_load'].std()
-    ax4.bar(load_std.index, load_std.values, color='mediumseagreen', 
+    ax4.bar(data.m_server_ids, summary.load_std, color='mediumseagreen', 
             edgecolor='black', alpha=0.7)
     ax4.set_xlabel('Server ID', fontweight='bold')
     ax4.set_ylabel('Load Std Dev', fontweight='bold')
     ax4.set_title('Load Variability per Server', fontweight='bold')
     ax4.grid(axis='y', alpha=0.3)
     
-    plt.tight_layout()
     plt.show()
     print("✓ Summary Dashboard Created")
 
@@ -227,21 +436,24 @@ def main():
     print(f"  Loaded {len(metrics_df)} request metrics")
     print(f"  Loaded {len(history_df)} load history records")
     
+    data = extract_columns(metrics_df, history_df)
+    summary = summarize(data)
+    
     # Generate visualizations
     print("\n[2/6] Creating request distribution plot...")
-    plot_request_distribution(metrics_df)
+    plot_request_distribution(data, summary)
     
     print("\n[3/6] Creating server load timeline...")
-    plot_server_loads_over_time(history_df)
+    plot_server_loads_over_time(data, summary)
     
     print("\n[4/6] Creating load heatmap...")
-    plot_load_heatmap(history_df)
+    plot_load_heatmap(data, summary)
     
     print("\n[5/6] Creating load statistics plot...")
-    plot_load_statistics(metrics_df)
+    plot_load_statistics(data, summary)
     
     print("\n[6/6] Creating summary dashboard...")
-    create_summary_dashboard(metrics_df, history_df)
+    create_summary_dashboard(data, summary)
     
     print("\n" + "=" * 60)
     print("All visualizations generated successfully!")